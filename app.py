@@ -1,12 +1,16 @@
 """Main Dash App for Rainfall Analysis"""
 
+from collections import OrderedDict
 from itertools import product
 from pathlib import Path
+from threading import Lock
+from uuid import uuid4
 from dash import dcc, html, Input, Output, State
 import pandas as pd
 import dash
 import dash_bootstrap_components as dbc
 import plotly.io as pio
+from plotly_resampler import FigureResampler
 from pyconfig import appConfig
 from pytemplate import hktemplate
 import pyfigure, pyfunc, pylayout, pylayoutfunc  # pylint: disable=multiple-imports
@@ -37,6 +41,14 @@ app = dash.Dash(
 )
 server = app.server
 
+# FigureResampler backing each session's "graph-rainfall", kept server-side for
+# relayout events and keyed by the uuid in "store-graph-rainfall". Figures live in
+# the memory of the worker that built them: with several gunicorn workers, a
+# relayout request served by another worker finds no figure and is ignored.
+GRAPH_RAINFALL_CACHE_SIZE = 16
+GRAPH_RAINFALL_RESAMPLER = OrderedDict()
+GRAPH_RAINFALL_LOCK = Lock()
+
 app.layout = dbc.Container(
     [
         pylayout.HTML_TITLE,
@@ -139,14 +151,16 @@ def callback_upload(content, filename, filedate, _b1, _b2, _b3, _b4):
         Output("container-graphbar-options", "style"),
         Output("button-analyze", "disabled"),
         Output("button-analyze", "outline"),
+        Output("store-graph-rainfall", "data"),
     ],
     Input("button-visualize", "n_clicks"),
     State("output-table", "derived_virtual_data"),
     State("output-table", "columns"),
     State("radio-graphbar-options", "value"),
+    State("store-graph-rainfall", "data"),
     prevent_initial_call=True,
 )
-def callback_visualize(_, table_data, table_columns, graphbar_opt):
+def callback_visualize(_, table_data, table_columns, graphbar_opt, resampler_key):
     """Callback for visualizing the rainfall data."""
 
     dataframe = pyfunc.transform_to_dataframe(table_data, table_columns)
@@ -166,6 +180,17 @@ def callback_visualize(_, table_data, table_columns, graphbar_opt):
         else:
             fig = pyfigure.generate_scatter_figure(dataframe)
 
+    with GRAPH_RAINFALL_LOCK:
+        GRAPH_RAINFALL_RESAMPLER.pop(resampler_key, None)
+
+        if isinstance(fig, FigureResampler):
+            resampler_key = uuid4().hex
+            GRAPH_RAINFALL_RESAMPLER[resampler_key] = fig
+            if len(GRAPH_RAINFALL_RESAMPLER) > GRAPH_RAINFALL_CACHE_SIZE:
+                GRAPH_RAINFALL_RESAMPLER.popitem(last=False)
+        else:
+            resampler_key = None
+
     return [
         fig,
         row_download_table_style,
@@ -173,9 +198,30 @@ def callback_visualize(_, table_data, table_columns, graphbar_opt):
         row_graphbar_options_style,
         button_analyze_disabled,
         button_analyze_outline,
+        resampler_key,
     ]
 
 
+@app.callback(
+    Output("graph-rainfall", "figure", allow_duplicate=True),
+    Input("graph-rainfall", "relayoutData"),
+    State("store-graph-rainfall", "data"),
+    prevent_initial_call=True,
+)
+def callback_resample_rainfall(relayoutdata, resampler_key):
+    """Callback for resampling the rainfall graph on zoom/pan."""
+
+    with GRAPH_RAINFALL_LOCK:
+        fig = GRAPH_RAINFALL_RESAMPLER.get(resampler_key)
+        if fig is not None:
+            GRAPH_RAINFALL_RESAMPLER.move_to_end(resampler_key)
+
+    if fig is None:
+        return dash.no_update
+
+    return fig.construct_update_data_patch(relayoutdata)
+
+
 @app.callback(
     Output("download-csv", "data"),
     Input("button-download-csv", "n_clicks"),
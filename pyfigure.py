@@ -4,14 +4,17 @@ This module contains functions for generating different types of figures
 """
 
 from collections import defaultdict, OrderedDict
+from functools import wraps
+from hashlib import blake2b
 from itertools import cycle, islice
-import re
+from threading import Lock
 import numpy as np
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
 from dash import dcc
 from plotly.subplots import make_subplots
+from plotly_resampler import FigureResampler
+from plotly_resampler.aggregation import LTTB
 from pyconfig import appConfig
 import pytemplate
 
@@ -19,6 +22,9 @@ THRESHOLD_SUMMARY = (367 * 8) // 2
 THRESHOLD_GRAPH_RAINFALL = 365 * 8
 THRESHOLD_XAXES = 12 * 2 * 5
 THRESHOLD_STATIONS = 8
+FIGURE_CACHE_SIZE = 32
+N_SHOWN_SAMPLES = 2000
+MAX_WATERMARK_SUBPLOTS = 32
 
 LABEL_GRAPH_RAINFALL = {
     "title": "<b>Rainfall Each Station</b>",
@@ -27,8 +33,74 @@ LABEL_GRAPH_RAINFALL = {
     "legend": {"title": "Stations"},
 }
 
+TICKTEXT_FORMAT = {"monthly": "%B %Y", "yearly": "%Y"}
+TICKTEXT_FORMAT_DEFAULT = "%d %b %Y"
+
 current_font_color = pytemplate.FONT_COLOR_RGB_ALPHA
 
+RAINFALL_DOWNSAMPLER = LTTB()
+
+
+def _hashable_argument(value):
+    """Convert a figure argument into a hashable component of a cache key."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        labels = value.columns if isinstance(value, pd.DataFrame) else [value.name]
+        row_hashes = pd.util.hash_pandas_object(value, index=True).to_numpy()
+        digest = blake2b(row_hashes.tobytes(), digest_size=32).digest()
+        return (tuple(labels), value.shape, digest)
+    if isinstance(value, (list, tuple, pd.Index)):
+        return tuple(_hashable_argument(item) for item in value)
+    return value
+
+
+def memoize_figure(func):
+    """
+    Cache the figure built by a `generate_*` function for identical inputs.
+
+    DataFrame arguments are keyed on their labels, shape and content hash,
+    so a summary rebuilt from the same table hits the cache. At most
+    FIGURE_CACHE_SIZE figures are kept (least recently used first out).
+
+    Args:
+        func (callable): The figure function to wrap.
+
+    Returns:
+        callable: The wrapped function, with a `cache_clear` attribute.
+    """
+    cache = OrderedDict()
+    lock = Lock()
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        key = _hashable_argument((args, tuple(sorted(kwargs.items()))))
+        with lock:
+            if key in cache:
+                cache.move_to_end(key)
+                return cache[key]
+
+        result = func(*args, **kwargs)
+
+        with lock:
+            cache[key] = result
+            if len(cache) > FIGURE_CACHE_SIZE:
+                cache.popitem(last=False)
+
+        return result
+
+    wrapper.cache_clear = cache.clear
+    return wrapper
+
+
+def _colors_for(n_traces: int, repeat: int) -> list:
+    """
+    Colors for `n_traces` traces made of `repeat` blocks of one trace per station.
+
+    Each block cycles through the template colorway, so a station keeps
+    the same color in every block.
+    """
+    colorway = pytemplate.hktemplate.layout.colorway
+    return list(islice(cycle(colorway), n_traces // repeat)) * repeat
+
 
 def generate_watermark(
     subplot_number: int = 1, watermark_source=appConfig.TEMPLATE.WATERMARK_SOURCE
@@ -61,24 +133,68 @@ def generate_watermark(
     }
 
 
+WATERMARKS = [generate_watermark(n) for n in range(1, MAX_WATERMARK_SUBPLOTS + 1)]
+
+
+def generate_subplot_watermarks(rows: int) -> list[dict]:
+    """
+    Get the watermarks for subplots 2 to `rows`.
+
+    The first subplot already has the template watermark. Watermarks are
+    taken from the precomputed WATERMARKS and only generated beyond
+    MAX_WATERMARK_SUBPLOTS.
+
+    Args:
+        rows (int): The number of subplots.
+
+    Returns:
+        list[dict]: The watermark properties of each additional subplot.
+    """
+    extra = range(MAX_WATERMARK_SUBPLOTS + 1, rows + 1)
+    return WATERMARKS[1:rows] + [generate_watermark(n) for n in extra]
+
+
 def generate_scatter_figure(dataframe):
     """
     Generate a scatter plot figure based on the provided dataframe.
 
+    Above THRESHOLD_GRAPH_RAINFALL rows, the figure is wrapped in a
+    FigureResampler that sends at most N_SHOWN_SAMPLES LTTB-downsampled
+    points per station for the current viewport. The Dash app must forward
+    the graph's relayoutData to `construct_update_data_patch` to resample on
+    zoom/pan.
+
     Parameters:
     dataframe (pandas.DataFrame): The dataframe containing the data to be plotted.
 
     Returns:
-    plotly.graph_objs._figure.Figure: The scatter plot figure.
+    plotly.graph_objs._figure.Figure: The scatter plot figure
+        (a plotly_resampler.FigureResampler above the threshold).
     """
 
-    data = [
-        go.Scatter(x=dataframe.index, y=dataframe[col], mode="lines", name=col)
-        for col in dataframe.columns
-    ]
     layout = go.Layout(hovermode="closest", **LABEL_GRAPH_RAINFALL)
+    xvals = dataframe.index.to_numpy()
+
+    # single figure, so every station shares one WebGL context
+    if len(dataframe) <= THRESHOLD_GRAPH_RAINFALL:
+        data = [
+            go.Scattergl(x=xvals, y=dataframe[col], mode="lines", name=col)
+            for col in dataframe.columns
+        ]
+        return go.Figure(data, layout)
+
+    fig = FigureResampler(
+        go.Figure(layout=layout),
+        default_n_shown_samples=N_SHOWN_SAMPLES,
+        default_downsampler=RAINFALL_DOWNSAMPLER,
+    )
 
-    fig = go.Figure(data, layout)
+    for col in dataframe.columns:
+        fig.add_trace(
+            go.Scattergl(mode="lines", name=col),
+            hf_x=xvals,
+            hf_y=np.ascontiguousarray(dataframe[col].to_numpy()),
+        )
 
     return fig
 
@@ -90,6 +206,8 @@ def generate_bar_figure(dataframe, barmode="stack"):
     Parameters:
     - dataframe: pandas DataFrame
         The input dataframe containing the data for the bar figure.
+        If it has more rows than THRESHOLD_GRAPH_RAINFALL, it is aggregated
+        to monthly sums before plotting (months without data stay missing).
     - barmode: str, optional
         The mode for displaying the bars. Default is "stack".
 
@@ -99,6 +217,9 @@ def generate_bar_figure(dataframe, barmode="stack"):
 
     """
 
+    if len(dataframe) > THRESHOLD_GRAPH_RAINFALL:
+        dataframe = dataframe.resample("MS").sum(min_count=1)
+
     if barmode == "stack":
         col_df = dataframe.columns[::-1]
         bargap = 0
@@ -169,6 +290,39 @@ def generate_empty_figure(text: str = "", size: int = 40):
     return go.Figure(data, layout)
 
 
+def update_subplot_axes(
+    fig: go.Figure,
+    rows: int,
+    update_x_axes: dict,
+    update_y_axes: dict,
+    xaxis_title: str = None,
+):
+    """
+    Apply the same x/y axis settings to every row of a subplot figure.
+
+    All axes are updated in a single `update_layout` call.
+
+    Args:
+        fig (go.Figure): The subplot figure to update.
+        rows (int): The number of rows in the subplot grid.
+        update_x_axes (dict): The properties applied to each x-axis.
+        update_y_axes (dict): The properties applied to each y-axis.
+        xaxis_title (str, optional): The title of the bottom x-axis.
+            Defaults to None.
+    """
+    axis_updates = {}
+    for n_row in range(1, rows + 1):
+        suffix = "" if n_row == 1 else n_row
+        axis_updates[f"xaxis{suffix}"] = update_x_axes
+        axis_updates[f"yaxis{suffix}"] = update_y_axes
+
+    if xaxis_title is not None:
+        axis_updates[f"xaxis{suffix}"] = {**update_x_axes, "title": xaxis_title}
+
+    fig.update_layout(**axis_updates)
+
+
+@memoize_figure
 def generate_summary_maximum_sum(
     summary,
     ufunc_cols: list[str] = None,
@@ -217,24 +371,21 @@ def generate_summary_maximum_sum(
         subplot_titles=subplot_titles,
     )
 
-    fig.layout.images = [generate_watermark(n) for n in range(2, rows + 1)]
+    fig.layout.images = generate_subplot_watermarks(rows)
 
     data_dict = defaultdict(list)
-    stations = [station_name for station_name, _ in summary.columns.to_list()]
-    stations = list(OrderedDict.fromkeys(stations))
-    last_series = None
-    for station in stations:
-        for ufcol, series in summary[station].items():
-            if ufcol in ufunc_cols:
-                _bar = go.Bar(
-                    x=np.arange(series.index.size),
-                    y=series,
-                    name=f"{station} ({ufcol})",
-                    legendgroup=station,
-                    legendgrouptitle_text=station,
-                )
-                data_dict[ufcol].append(_bar)
-            last_series = series
+    cols_set = set(ufunc_cols)
+    xindex = np.arange(summary.index.size)
+    for (station, ufcol), series in summary.items():
+        if ufcol in cols_set:
+            _bar = go.Bar(
+                x=xindex,
+                y=series.to_numpy(),
+                name=f"{station} ({ufcol})",
+                legendgroup=station,
+                legendgrouptitle_text=station,
+            )
+            data_dict[ufcol].append(_bar)
 
     for counter, (ufcol, data) in enumerate(data_dict.items(), 1):
         fig.add_traces(data, rows=counter, cols=cols)
@@ -250,60 +401,40 @@ def generate_summary_maximum_sum(
         legend={"title": "<b>Stations</b>"},
     )
 
-    ticktext = last_series.index.strftime("%d %b %Y")
-
-    if period.lower() in ["monthly", "yearly"]:
-        if period.lower() == "monthly":
-            ticktext = last_series.index.strftime("%B %Y")
-        if period.lower() == "yearly":
-            ticktext = last_series.index.strftime("%Y")
+    ticktext = summary.index.strftime(
+        TICKTEXT_FORMAT.get(period.lower(), TICKTEXT_FORMAT_DEFAULT)
+    )
+    tickstep = 1 if summary.index.size <= THRESHOLD_XAXES else 2
+    xticktext = ticktext[::tickstep]
+    xtickvals = xindex[::tickstep]
 
-    if last_series.index.size <= THRESHOLD_XAXES:
-        xticktext = ticktext
-        xtickvals = np.arange(last_series.index.size)
-    else:
-        xticktext = ticktext[::2]
-        xtickvals = np.arange(last_series.index.size)[::2]
+    grid_color = current_font_color.replace("0.4", "0.2")
 
     update_x_axes = {
         "ticktext": xticktext,
         "tickvals": xtickvals,
-        "gridcolor": current_font_color.replace("0.4", "0.2"),
+        "gridcolor": grid_color,
         "gridwidth": 2,
     }
 
     update_y_axes = {
-        "gridcolor": current_font_color.replace("0.4", "0.2"),
+        "gridcolor": grid_color,
         "gridwidth": 2,
         "fixedrange": True,
         "title": "<b>Rainfall (mm)</b>",
     }
 
-    def update_axis(fig, update, n, axis: str = "x"):
-        n = "" if n == 1 else n
-        fig.update(layout={f"{axis}axis{n}": update})
-
-    for n_row in range(1, rows + 1):
-        for axis, update in zip(["x", "y"], [update_x_axes, update_y_axes]):
-            update_axis(fig, update, n_row, axis)
+    update_subplot_axes(fig, rows, update_x_axes, update_y_axes)
 
     # ref: https://stackoverflow.com/questions/39863250
 
-    n_data = len(fig.data)
-    n_split = n_data // 2
-
-    if n_split < len(pytemplate.hktemplate.layout.colorway):
-        colors = list(pytemplate.hktemplate.layout.colorway[:n_split])
-    else:
-        colorway_list = pytemplate.hktemplate.layout.colorway
-        colors = list(islice(cycle(colorway_list), n_split))
-
-    for data, color in zip(fig.data, colors * 2):
+    for data, color in zip(fig.data, _colors_for(len(fig.data), 2)):
         data.marker.color = color
 
     return dcc.Graph(figure=fig)
 
 
+@memoize_figure
 def generate_summary_rain_dry(
     summary: pd.DataFrame,
     ufunc_cols: list[str] = None,
@@ -355,49 +486,56 @@ def generate_summary_rain_dry(
         subplot_titles=subplot_titles,
     )
 
-    fig.layout.images = [generate_watermark(n) for n in range(2, rows + 1)]
+    fig.layout.images = generate_subplot_watermarks(rows)
 
-    for station in summary.columns.levels[0]:
-        summary[(station, "n_left")] = (
-            summary[(station, "days")].max()
-            - summary[(station, "n_rain")]
-            - summary[(station, "n_dry")]
-        )
+    days_max = summary.xs("days", axis=1, level=1).to_numpy().max()
+    n_rain = summary.xs("n_rain", axis=1, level=1)
+    n_dry = summary.xs("n_dry", axis=1, level=1)
+
+    n_left = days_max - n_rain.to_numpy() - n_dry.to_numpy()
+    n_left = pd.DataFrame(
+        n_left,
+        index=summary.index,
+        columns=pd.MultiIndex.from_product([n_rain.columns, ["n_left"]]),
+    )
+    summary = pd.concat([summary, n_left], axis=1)
 
     data_dict = defaultdict(list)
-    stations = [station_name for station_name, _ in summary.columns.to_list()]
-    stations = list(OrderedDict.fromkeys(stations))
-    last_series = None
-    for station in stations:
-        for ufcol, series in summary[station].items():
-            if ufcol in ufunc_cols + ["n_left"]:
-                if ufcol in ufunc_cols:
-                    _bar = go.Bar(
-                        x=np.arange(series.index.size),
-                        y=series,
-                        name=f"{station} ({ufcol})",
-                        legendgroup=station,
-                        legendgrouptitle_text=station,
-                        marker_line_width=0,
-                        customdata=series.index,
-                        hovertemplate=f"{station}<br>{ufcol}: %{{y}}<extra></extra>",
-                    )
-                    data_dict[station].append(_bar)
-                if ufcol == "n_left":
-                    _bar = go.Bar(
-                        x=np.arange(series.index.size),
-                        y=series,
-                        name=f"<i>{station} (border)</i>",
-                        legendgroup=station,
-                        legendgrouptitle_text=station,
-                        showlegend=True,
-                        hoverinfo="skip",
-                        marker_line_width=0,
-                        marker_opacity=1,
-                        legendrank=500,
-                    )
-                    data_dict[station].append(_bar)
-            last_series = series
+    cols_set = set(ufunc_cols)
+    xindex = np.arange(summary.index.size)
+    # plain dicts are only validated once, when fig.add_traces builds the traces
+    station_templates = {}
+    for (station, ufcol), series in summary.items():
+        if station not in station_templates:
+            station_templates[station] = {
+                "type": "bar",
+                "x": xindex,
+                "legendgroup": station,
+                "legendgrouptitle_text": station,
+                "marker_line_width": 0,
+            }
+        station_template = station_templates[station]
+
+        if ufcol in cols_set:
+            _bar = {
+                **station_template,
+                "y": series.to_numpy(),
+                "name": f"{station} ({ufcol})",
+                "customdata": series.index,
+                "hovertemplate": f"{station}<br>{ufcol}: %{{y}}<extra></extra>",
+            }
+            data_dict[station].append(_bar)
+        elif ufcol == "n_left":
+            _bar = {
+                **station_template,
+                "y": series.to_numpy(),
+                "name": f"<i>{station} (border)</i>",
+                "showlegend": True,
+                "hoverinfo": "skip",
+                "marker_opacity": 1,
+                "legendrank": 500,
+            }
+            data_dict[station].append(_bar)
 
     for counter, (ufcol, data) in enumerate(data_dict.items(), 1):
         fig.add_traces(data, rows=counter, cols=cols)
@@ -412,47 +550,35 @@ def generate_summary_rain_dry(
         legend={"title": "<b>Stations</b>"},
     )
 
-    ticktext = last_series.index.strftime("%d %b %Y")
+    ticktext = summary.index.strftime(
+        TICKTEXT_FORMAT.get(period.lower(), TICKTEXT_FORMAT_DEFAULT)
+    )
+    tickstep = 1 if summary.index.size <= THRESHOLD_XAXES else 2
+    xticktext = ticktext[::tickstep]
+    xtickvals = xindex[::tickstep]
 
-    if period.lower() in ["monthly", "yearly"]:
-        if period.lower() == "monthly":
-            ticktext = last_series.index.strftime("%B %Y")
-        if period.lower() == "yearly":
-            ticktext = last_series.index.strftime("%Y")
-
-    if last_series.index.size <= THRESHOLD_XAXES:
-        xticktext = ticktext
-        xtickvals = np.arange(last_series.index.size)
-    else:
-        xticktext = ticktext[::2]
-        xtickvals = np.arange(last_series.index.size)[::2]
+    grid_color = current_font_color.replace("0.4", "0.1")
 
     update_x_axes = {
         "ticktext": xticktext,
         "tickvals": xtickvals,
-        "gridcolor": current_font_color.replace("0.4", "0.1"),
+        "gridcolor": grid_color,
         "gridwidth": 2,
         # "nticks": 2,
         "ticklabelstep": 2,
     }
 
     update_y_axes = {
-        "gridcolor": current_font_color.replace("0.4", "0.1"),
+        "gridcolor": grid_color,
         "gridwidth": 2,
         "fixedrange": True,
         "title": "<b>Days</b>",
-        "range": [0, summary[(station, "days")].max()],
+        "range": [0, days_max],
     }
 
-    def update_axis(fig, update, n, axis: str = "x"):
-        n = "" if n == 1 else n
-        fig.update(layout={f"{axis}axis{n}": update})
-
-    fig.update(layout={f"xaxis{rows}": {"title": "<b>Date</b>"}})
-
-    for n_row in range(1, rows + 1):
-        for axis, update in zip(["x", "y"], [update_x_axes, update_y_axes]):
-            update_axis(fig, update, n_row, axis)
+    update_subplot_axes(
+        fig, rows, update_x_axes, update_y_axes, xaxis_title="<b>Date</b>"
+    )
 
     color_list = list(pytemplate.hktemplate.layout.colorway[:2]) + ["DarkGray"]
 
@@ -462,6 +588,7 @@ def generate_summary_rain_dry(
     return dcc.Graph(figure=fig)
 
 
+@memoize_figure
 def generate_summary_maximum_date(
     summary_all: pd.DataFrame,
     ufunc_col: list[str] = None,
@@ -505,29 +632,34 @@ def generate_summary_maximum_date(
         subplot_titles=subplot_titles,
     )
 
-    fig.layout.images = [generate_watermark(n) for n in range(2, rows + 1)]
+    fig.layout.images = generate_subplot_watermarks(rows)
 
     # Create new DF
 
-    all_stat = []
+    records = {}
     for summary, period in zip(summary_all, periods):
-        stations = [station_name for station_name, _ in summary.columns.to_list()]
-        stations = list(OrderedDict.fromkeys(stations))
+        stations = summary.columns.get_level_values(0).unique().tolist()
         for station in stations:
             _max = summary[station].dropna(subset=ufunc_col)
-            _max["max_date"] = pd.to_datetime(_max["max_date"])
-            _max = _max.set_index("max_date")[["max"]]
-            _max.columns = pd.MultiIndex.from_tuples([(period, station)])
-            all_stat.append(_max)
+            records[(period, station)] = pd.Series(
+                _max["max"].to_numpy(),
+                index=pd.DatetimeIndex(pd.to_datetime(_max["max_date"])),
+            )
 
-    all_df = pd.concat(all_stat, axis=1)
+    # keys become the (period, station) column levels
+    all_df = pd.concat(records, axis=1)
 
     bubble_sizes = [10, 10, 10] if bubble_sizes is None else bubble_sizes
 
     data_dict = defaultdict(list)
     for period, bubble_size in zip(all_df.columns.levels[0], bubble_sizes):
         sizeref = 2.0 * all_df[period].max().max() / (bubble_size**2)
+        # the date index is shared by every station of the period
+        date_strs = all_df[period].index.strftime("%d %B %Y").to_numpy()
         for station, series in all_df[period].items():
+            customdata = np.empty((date_strs.size, 2), dtype=object)
+            customdata[:, 0] = date_strs
+            customdata[:, 1] = series.to_numpy()
             yvals = series.where(~series.notna(), station)
             _scatter = go.Scatter(
                 x=series.index,
@@ -540,13 +672,7 @@ def generate_summary_maximum_date(
                 legendgrouptitle_text=station,
                 name=f"{period}",
                 hovertemplate="<i>%{y}</i><br>%{customdata[0]}<br>%{marker.size} mm<extra></extra>",
-                customdata=np.stack(
-                    [
-                        series.index.strftime("%d %B %Y"),
-                        series.to_numpy(),
-                    ],
-                    axis=-1,
-                ),
+                customdata=customdata,
             )
             data_dict[period].append(_scatter)
 
@@ -564,17 +690,11 @@ def generate_summary_maximum_date(
         hoverdistance=50,
     )
 
-    def update_axis(fig, update, n, axis: str = "x"):
-        n = "" if n == 1 else n
-        fig.update(layout={f"{axis}axis{n}": update})
-
-    # XAXES
-
-    fig.update(layout={f"xaxis{rows}": {"title": "<b>Date</b>"}})
-
     # GENERAL UPDATE
+    grid_color = current_font_color.replace("0.4", "0.1")
+
     update_x_axes = {
-        "gridcolor": current_font_color.replace("0.4", "0.1"),
+        "gridcolor": grid_color,
         "gridwidth": 2,
         "showspikes": True,
         "spikesnap": "cursor",
@@ -582,31 +702,76 @@ def generate_summary_maximum_date(
         "spikethickness": 1,
     }
     update_y_axes = {
-        "gridcolor": current_font_color.replace("0.4", "0.1"),
+        "gridcolor": grid_color,
         "gridwidth": 2,
         "fixedrange": True,
         "title": "<b>Station</b>",
     }
 
-    for n_row in range(1, rows + 1):
-        for axis, update in zip(["x", "y"], [update_x_axes, update_y_axes]):
-            update_axis(fig, update, n_row, axis)
-
-    n_data = len(fig.data)
-    n_split = n_data // 3
-
-    if n_split < len(pytemplate.hktemplate.layout.colorway):
-        colors = list(pytemplate.hktemplate.layout.colorway[:n_split])
-    else:
-        colorway_list = pytemplate.hktemplate.layout.colorway
-        colors = list(islice(cycle(colorway_list), n_split))
+    update_subplot_axes(
+        fig, rows, update_x_axes, update_y_axes, xaxis_title="<b>Date</b>"
+    )
 
-    for data, color in zip(fig.data, colors * 3):
+    for data, color in zip(fig.data, _colors_for(len(fig.data), 3)):
         data.marker.color = color
 
     return dcc.Graph(figure=fig)
 
 
+def fit_ols_trendline(xvals: np.ndarray, yvals: np.ndarray):
+    """
+    Fit a least-squares line y = slope * x + intercept.
+
+    Args:
+        xvals (np.ndarray): The x values.
+        yvals (np.ndarray): The y values.
+
+    Returns:
+        tuple: The fitted y values, the equation text and the R² text.
+            With fewer than two points there is no fit: the fitted values
+            are NaN and the equation and R² are None.
+    """
+    if xvals.size < 2:
+        return np.full(yvals.shape, np.nan), None, None
+
+    slope, intercept = np.polyfit(xvals, yvals, 1)
+    trend = slope * xvals + intercept
+
+    ss_res = np.sum((yvals - trend) ** 2)
+    ss_tot = np.sum((yvals - yvals.mean()) ** 2)
+    r2 = 1 - ss_res / ss_tot
+
+    return trend, f"y = {slope:g} * x + {intercept:g}", f"{r2:f}"
+
+
+def generate_trendline_hovertemplate(
+    equation: str = None, r2: str = None, x_unit: str = ""
+) -> str:
+    """
+    Generate the hovertemplate of an OLS trendline.
+
+    Args:
+        equation (str, optional): The trendline equation. Defaults to None.
+        r2 (str, optional): The coefficient of determination. Defaults to None.
+        x_unit (str, optional): Unit suffix for the x value. Defaults to "".
+
+    Returns:
+        str: The hovertemplate, or "<extra></extra>" if there is no fit.
+    """
+    if equation is None:
+        return "<extra></extra>"
+
+    return (
+        "<b>OLS trendline</b><br>"
+        + f"<i>{equation}</i><br>"
+        + f"<i>R<sup>2</sup>: {r2}</i><br>"
+        + "<b>%{y} mm</b> (trend)<br>"
+        + f"<i>%{{x}}{x_unit}</i>"
+        + "<extra></extra>"
+    )
+
+
+@memoize_figure
 def generate_cumulative_sum(
     cumulative_sum_df: pd.DataFrame, data_column: str = None
 ) -> go.Figure:
@@ -625,62 +790,50 @@ def generate_cumulative_sum(
 
     data_column = cumulative_sum_df.columns[0] if data_column is None else data_column
 
-    new_dataframe = cumulative_sum_df.copy()
-    new_dataframe["number"] = np.arange(1, len(new_dataframe) + 1)
-
-    fig = px.scatter(
-        x=new_dataframe.number,
-        y=new_dataframe[data_column],
-        trendline="ols",
-        trendline_color_override=pytemplate.hktemplate.layout.colorway[1],
+    xvals = np.arange(1, len(cumulative_sum_df) + 1)
+    yvals = cumulative_sum_df[data_column].to_numpy()
+    trend, equation, r2 = fit_ols_trendline(xvals, yvals)
+
+    _scatter = go.Scatter(
+        x=xvals,
+        y=yvals,
+        mode="markers+lines",
+        name=data_column,
+        showlegend=False,
+        line_dash="dashdot",
+        line_width=1,
+        marker_size=12,
+        marker_symbol="circle",
+        hovertemplate=(
+            f"{data_column}<br><b>%{{y}} mm</b><br><i>%{{x}}</i><extra></extra>"
+        ),
     )
 
-    # MODIFIED SCATTER
-
-    _scatter = fig.data[0]
-    _scatter.mode = "markers+lines"
-    _scatter.line.dash = "dashdot"
-    _scatter.line.width = 1
-    _scatter.marker.size = 12
-    _scatter.marker.symbol = "circle"
-    _scatter.name = data_column
-    _scatter.hovertemplate = (
-        f"{data_column}<br><b>%{{y}} mm</b><br><i>%{{x}}</i><extra></extra>"
+    _trendline = go.Scatter(
+        x=xvals,
+        y=trend,
+        mode="lines",
+        name="trendline",
+        showlegend=True,
+        line_color=pytemplate.hktemplate.layout.colorway[1],
+        hovertemplate=generate_trendline_hovertemplate(equation, r2),
     )
 
-    # MODIFIED TRENDLINE
-
-    _trendline = fig.data[1]
-    _oldhovertemplate = _trendline.hovertemplate
-
-    if _oldhovertemplate != "<extra></extra>":
-        re_pattern = re.compile("<br>(.+)<br>R.+=([0-9.]+)<br>")
-        equation, r2 = re_pattern.findall(_oldhovertemplate)[0]
-        _newtemplate = (
-            "<b>OLS trendline</b><br>"
-            + f"<i>{equation}</i><br>"
-            + f"<i>R<sup>2</sup>: {r2}</i><br>"
-            + "<b>%{y} mm</b> (trend)<br>"
-            + "<i>%{x}</i>"
-            + "<extra></extra>"
-        )
-        _trendline.hovertemplate = _newtemplate
-
-    _trendline.showlegend = True
-    _trendline.name = "trendline"
+    fig = go.Figure([_scatter, _trendline])
 
     fig.update_layout(
         xaxis_title="<b>Year</b>",
         yaxis_title="<b>Cumulative Annual (mm)</b>",
         margin=dict(l=0, t=35, b=0, r=0),
-        xaxis_tickvals=new_dataframe.number,
-        xaxis_ticktext=new_dataframe.index.year,
+        xaxis_tickvals=xvals,
+        xaxis_ticktext=cumulative_sum_df.index.year,
         yaxis_tickformat=".0f",
     )
 
     return dcc.Graph(figure=fig)
 
 
+@memoize_figure
 def generate_scatter_with_trendline(
     cumulative_sum_df: pd.DataFrame, data_column: str
 ) -> go.Figure:
@@ -695,53 +848,38 @@ def generate_scatter_with_trendline(
         go.Figure: The scatter plot figure with a trendline.
     """
 
-    cumulative_sum_df = cumulative_sum_df.copy()
-
     # Create Mean Cumulative Other Stations
-    cumsum_x = cumulative_sum_df[data_column]
+    cumsum_x = cumulative_sum_df[data_column].to_numpy()
     other_stations = cumulative_sum_df.columns.drop(data_column)
-    cumsum_y = cumulative_sum_df[other_stations].mean(axis=1)
+    cumsum_y = cumulative_sum_df[other_stations].mean(axis=1).to_numpy()
+    trend, equation, r2 = fit_ols_trendline(cumsum_x, cumsum_y)
 
-    fig = px.scatter(
+    _scatter = go.Scatter(
         x=cumsum_x,
         y=cumsum_y,
-        trendline="ols",
-        trendline_color_override=pytemplate.hktemplate.layout.colorway[1],
+        mode="markers+lines",
+        name=data_column,
+        showlegend=False,
+        line_dash="dashdot",
+        line_width=1,
+        marker_size=12,
+        marker_symbol="circle",
+        hovertemplate=(
+            f"{data_column}<br><b>y: %{{y}} mm<br><i>x: %{{x}} mm</i></b><extra></extra>"
+        ),
     )
 
-    # MODIFIED SCATTER
-
-    _scatter = fig.data[0]
-    _scatter.mode = "markers+lines"
-    _scatter.line.dash = "dashdot"
-    _scatter.line.width = 1
-    _scatter.marker.size = 12
-    _scatter.marker.symbol = "circle"
-    _scatter.name = data_column
-    _scatter.hovertemplate = (
-        f"{data_column}<br><b>y: %{{y}} mm<br><i>x: %{{x}} mm</i></b><extra></extra>"
+    _trendline = go.Scatter(
+        x=cumsum_x,
+        y=trend,
+        mode="lines",
+        name="trendline",
+        showlegend=True,
+        line_color=pytemplate.hktemplate.layout.colorway[1],
+        hovertemplate=generate_trendline_hovertemplate(equation, r2, x_unit=" mm"),
     )
 
-    # MODIFIED TRENDLINE
-
-    _trendline = fig.data[1]
-    _oldhovertemplate = _trendline.hovertemplate
-
-    if _oldhovertemplate != "<extra></extra>":
-        re_pattern = re.compile("<br>(.+)<br>R.+=([0-9.]+)<br>")
-        equation, r2 = re_pattern.findall(_oldhovertemplate)[0]
-        _newtemplate = (
-            "<b>OLS trendline</b><br>"
-            + f"<i>{equation}</i><br>"
-            + f"<i>R<sup>2</sup>: {r2}</i><br>"
-            + "<b>%{y} mm</b> (trend)<br>"
-            + "<i>%{x} mm</i>"
-            + "<extra></extra>"
-        )
-        _trendline.hovertemplate = _newtemplate
-
-    _trendline.showlegend = True
-    _trendline.name = "trendline"
+    fig = go.Figure([_scatter, _trendline])
 
     fig.update_layout(
         xaxis_title=f"<b>Cumulative Annual {data_column} (mm)</b>",
@@ -253,7 +253,8 @@ HTML_ROW_GRAPH_ONE = html.Div(
                     figure=pyfigure.generate_empty_figure(),
                     config={"staticPlot": True},
                 )
-            )
+            ),
+            dcc.Store(id="store-graph-rainfall"),
         ],
         fluid=True,
     )